@@ -1,14 +1,30 @@
 #!/usr/bin/env python3
+import io
+import math
 import os
 import logging
-from typing import Dict, Any
+from statistics import NormalDist
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from series_temporais import (
+    JANELA_DIARIA_PADRAO,
+    JANELA_MENSAL_PADRAO,
+    SerieTemporalIncremental,
+)
+
 # --- Variáveis de Configuração ---
 ARQUIVO_TRANSACOES = "transacoes.csv"
 PASTA_IMAGEM = "imagens"
+TAMANHO_AMOSTRA_PADRAO = 10_000  # linhas lidas no modo amostral
+CONFIANCA_PADRAO = 0.95
+TAMANHO_BLOCO_PADRAO = 128  # bytes por bloco sorteado do CSV
+MAX_RODADAS_AMOSTRAGEM = 8
+FATOR_AMPLIACAO_MAXIMO = 4  # crescimento máximo da amostra por rodada
+UNIDADES_POR_ESTRATO = 8  # unidades sorteadas por estrato no piloto
 
 
 # Configure logging
@@ -40,34 +56,520 @@ def _carregar_dados_com_seguranca(caminho_arquivo: str) -> pd.DataFrame:
         return pd.DataFrame()
 
 
-def analisar_vendas(df_transacoes: pd.DataFrame) -> Dict[str, Any]:
-    """Realiza a análise de vendas e retorna dados agregados"""
+def _preparar_receita(df_transacoes: pd.DataFrame) -> pd.DataFrame:
+    """Converte datas e calcula a receita descartando linhas inválidas"""
+    df = df_transacoes.copy()
+    df['data_hora'] = pd.to_datetime(
+        df['data_hora'], format='%Y-%m-%d %H:%M:%S', errors='coerce'
+    )
+    df = df.dropna(subset=['data_hora'])
+    if df.empty:
+        return df
+
+    df.loc[:, 'receita'] = pd.to_numeric(
+        df.get('quantidade', 0), errors='coerce'
+    ) * pd.to_numeric(df.get('valor_unitario', 0), errors='coerce')
+    return df.dropna(subset=['receita'])
+
+
+def _receita_por_periodo(df: pd.DataFrame, freq: str) -> pd.Series:
+    """Soma a receita por período; só o índice agregado vira ``str``"""
+    periodos = df['data_hora'].dt.to_period(freq)
+    receita = df.groupby(periodos)['receita'].sum().sort_index()
+    receita.index = receita.index.astype(str)
+    receita.index.name = 'mes_ano' if freq == 'M' else 'dia'
+    return receita
+
+
+def _resultado_vazio(
+    janela_mensal: int = JANELA_MENSAL_PADRAO,
+    janela_diaria: int = JANELA_DIARIA_PADRAO,
+) -> Dict[str, Any]:
+    return {
+        "Performance por Mês/Ano": pd.Series(dtype=float),
+        "Indicadores Mensais": SerieTemporalIncremental('M', janela_mensal),
+        "Indicadores Diários": SerieTemporalIncremental('D', janela_diaria),
+    }
+
+
+def _resultado_amostral_vazio() -> Dict[str, Any]:
+    return {
+        "Performance por Mês/Ano": pd.Series(dtype=float),
+        "Erro Padrão": pd.Series(dtype=float),
+        "Intervalo de Confiança": pd.DataFrame(
+            columns=['inferior', 'superior'], dtype=float
+        ),
+        "Tamanho da Amostra": 0,
+    }
+
+
+def _validar_amostragem(
+    tamanho_amostra: Optional[int],
+    erro_alvo: Optional[float],
+    confianca: float,
+) -> None:
+    if tamanho_amostra is not None and tamanho_amostra < 2:
+        raise ValueError("tamanho_amostra deve ser maior ou igual a 2")
+    if erro_alvo is not None and erro_alvo <= 0:
+        raise ValueError("erro_alvo deve ser maior que zero")
+    if not 0 < confianca < 1:
+        raise ValueError("confianca deve estar entre 0 e 1")
+
+
+# Lê as unidades sorteadas e devolve (receita preparada, linhas lidas)
+LeitorDeUnidades = Callable[[np.ndarray], Tuple[pd.DataFrame, int]]
+
+
+def _momentos_por_estrato(
+    partes: List[pd.DataFrame], limites: np.ndarray
+) -> pd.DataFrame:
+    """Soma e soma dos quadrados das receitas das unidades sorteadas, por
+    estrato e mês (unidades sem venda no mês contribuem com zero)"""
+    df = pd.concat(partes)
+    if df.empty:
+        return pd.DataFrame(columns=['receita', 'quadrado'], dtype=float)
+    meses = df['data_hora'].dt.to_period('M').rename('mes_ano')
+    por_unidade = (
+        df.groupby([df['unidade'], meses])['receita'].sum().reset_index()
+    )
+    por_unidade['estrato'] = (
+        np.searchsorted(limites, por_unidade['unidade'], side='right') - 1
+    )
+    por_unidade['quadrado'] = por_unidade['receita'] ** 2
+    momentos = por_unidade.groupby(['estrato', 'mes_ano'])[
+        ['receita', 'quadrado']
+    ].sum()
+    return momentos.rename(index=str, level='mes_ano')
+
+
+def _componentes_por_mes(
+    momentos: pd.DataFrame, tamanhos: np.ndarray, sorteadas: np.ndarray
+) -> pd.DataFrame:
+    """Total estimado e variância por mês na amostra estratificada.
+
+    Total: ``Σ K_s · média_s``; variância: ``Σ K_s² (1/c_s - 1/K_s) s²_s``
+    (``K_s`` unidades no estrato, ``c_s`` sorteadas). ``a`` e ``b``
+    decompõem a variância como ``a/c - b`` para um ``c`` comum.
+    """
+    if momentos.empty:
+        return pd.DataFrame(
+            columns=['total', 'variancia', 'a', 'b'], dtype=float
+        )
+    estrato = momentos.index.get_level_values('estrato')
+    k = tamanhos[estrato]
+    c = sorteadas[estrato]
+    media = momentos['receita'].to_numpy() / c
+    s2 = np.where(
+        c > 1,
+        (momentos['quadrado'].to_numpy() - c * media**2)
+        / np.maximum(c - 1, 1),
+        0.0,
+    ).clip(min=0)
+    partes = pd.DataFrame(
+        {
+            'total': k * media,
+            'variancia': k**2 * (1 / c - 1 / k) * s2,
+            'a': k**2 * s2,
+            'b': k * s2,
+        },
+        index=momentos.index.get_level_values('mes_ano'),
+    )
+    return partes.groupby(level='mes_ano').sum().sort_index()
+
+
+def _sorteadas_para_erro_alvo(
+    componentes: pd.DataFrame, erro_alvo: float, z: float
+) -> int:
+    """Unidades por estrato para que a meia-largura relativa de todos os
+    meses fique abaixo de ``erro_alvo``"""
+    limite = (erro_alvo * componentes['total'] / z) ** 2 + componentes['b']
+    necessarias = (componentes['a'] / limite)[componentes['total'] > 0]
+    if necessarias.empty:
+        return 0
+    return int(np.ceil(necessarias.max()))
+
+
+def _contem(ordenado: np.ndarray, valores: np.ndarray) -> np.ndarray:
+    """Pertinência de ``valores`` no array ordenado ``ordenado``"""
+    if len(ordenado) == 0:
+        return np.zeros(len(valores), dtype=bool)
+    posicoes = np.searchsorted(ordenado, valores)
+    return (posicoes < len(ordenado)) & (
+        ordenado[np.minimum(posicoes, len(ordenado) - 1)] == valores
+    )
+
+
+def _sortear_novas(
+    limites: np.ndarray,
+    sorteadas: np.ndarray,
+    faltam: np.ndarray,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """Sorteia ``faltam[s]`` unidades ainda não sorteadas em cada estrato.
+
+    Sorteia posições com uma pequena folga e fica, em cada estrato, com as
+    primeiras válidas na ordem do sorteio (sem repetição e fora de
+    ``sorteadas``, que está ordenado); o custo acompanha o tamanho da
+    amostra e não o total de unidades. Estratos em que mais da metade do
+    restante será lida são embaralhados direto.
+    """
+    tamanhos = np.diff(limites)
+    ja = np.diff(np.searchsorted(sorteadas, limites))
+    densos = faltam * 2 > tamanhos - ja
+    novas = []
+    for estrato in np.flatnonzero(densos & (faltam > 0)):
+        faixa = np.arange(limites[estrato], limites[estrato + 1])
+        restantes = faixa[~_contem(sorteadas, faixa)]
+        novas.append(rng.choice(restantes, faltam[estrato], replace=False))
+
+    faltam = np.where(densos, 0, faltam)
+    while faltam.any():
+        pedidas = faltam + np.ceil(faltam / 4).astype(int)
+        estratos = np.repeat(np.arange(len(tamanhos)), pedidas)
+        candidatas = limites[estratos] + rng.integers(0, tamanhos[estratos])
+
+        ordem = np.argsort(candidatas, kind='stable')
+        repetida = np.zeros(len(candidatas), dtype=bool)
+        repetida[ordem[1:]] = np.diff(candidatas[ordem]) == 0
+        aceitas = np.sort(np.concatenate(novas)) if novas else sorteadas[:0]
+        validas = ~(
+            repetida
+            | _contem(sorteadas, candidatas)
+            | _contem(aceitas, candidatas)
+        )
+
+        # posição de cada candidata válida dentro do seu estrato
+        acumulado = np.cumsum(validas)
+        inicio_estrato = np.repeat(
+            np.concatenate([[0], np.cumsum(pedidas)[:-1]]), pedidas
+        )
+        anteriores = (
+            acumulado
+            - validas
+            - np.where(inicio_estrato > 0, acumulado[inicio_estrato - 1], 0)
+        )
+        escolhidas = validas & (anteriores < faltam[estratos])
+        novas.append(candidatas[escolhidas])
+        faltam = faltam - np.bincount(
+            estratos[escolhidas], minlength=len(tamanhos)
+        )
+    if not novas:
+        return np.empty(0, dtype=int)
+    return np.concatenate(novas)
+
+
+def _sortear_unidades(
+    total_unidades: int,
+    ler_unidades: LeitorDeUnidades,
+    unidades_iniciais: int,
+    erro_alvo: Optional[float],
+    z: float,
+    rng: np.random.Generator,
+) -> Tuple[pd.DataFrame, int]:
+    """Amostra estratificada por posição: as unidades são divididas em
+    faixas contíguas e cada faixa tem unidades sorteadas sem reposição.
+
+    Em arquivos ordenados por data as faixas acompanham os meses, o que
+    reduz muito a variância; cada faixa recebe ao menos
+    ``UNIDADES_POR_ESTRATO`` unidades para que sua variância tenha graus
+    de liberdade suficientes. Com ``erro_alvo`` a primeira leitura é o
+    piloto; as faixas são ampliadas em rodadas, reestimando o tamanho
+    necessário a cada uma, até atingir o alvo, esgotar a fonte ou
+    completar ``MAX_RODADAS_AMOSTRAGEM`` rodadas.
+    """
+    iniciais = min(max(2, unidades_iniciais), total_unidades)
+    num_estratos = max(1, iniciais // UNIDADES_POR_ESTRATO)
+    limites = np.linspace(0, total_unidades, num_estratos + 1).astype(int)
+    tamanhos = np.diff(limites)
+
+    sorteadas = np.zeros(num_estratos, dtype=int)
+    unidades = np.empty(0, dtype=int)
+    partes: List[pd.DataFrame] = []
+    linhas_lidas = 0
+    # piloto: reparte exatamente ``iniciais`` unidades entre os estratos,
+    # proporcionalmente ao tamanho de cada um
+    alvo = np.diff(iniciais * limites // total_unidades)
+    for _ in range(MAX_RODADAS_AMOSTRAGEM + 1):
+        novas = np.minimum(alvo, tamanhos)
+        sorteio = _sortear_novas(limites, unidades, novas - sorteadas, rng)
+        unidades = np.sort(np.concatenate([unidades, sorteio]))
+        parte, linhas = ler_unidades(sorteio)
+        partes.append(parte)
+        linhas_lidas += linhas
+        sorteadas = novas
+
+        componentes = _componentes_por_mes(
+            _momentos_por_estrato(partes, limites), tamanhos, sorteadas
+        )
+        if erro_alvo is None or (sorteadas == tamanhos).all():
+            break
+        necessarias = _sorteadas_para_erro_alvo(componentes, erro_alvo, z)
+        if necessarias <= sorteadas.max():
+            break
+        # o piloto é pequeno: amplia aos poucos e reestima a cada rodada
+        alvo = np.full(
+            num_estratos,
+            min(necessarias, FATOR_AMPLIACAO_MAXIMO * sorteadas.max()),
+        )
+    return componentes, linhas_lidas
+
+
+def _estimar_receita_mensal(
+    componentes: pd.DataFrame,
+    linhas_lidas: int,
+    z: float,
+    erro_alvo: Optional[float],
+) -> Dict[str, Any]:
+    """Monta o resultado amostral com erro padrão e intervalo"""
+    if componentes.empty:
+        resultado = _resultado_amostral_vazio()
+        resultado["Tamanho da Amostra"] = linhas_lidas
+        return resultado
+
+    estimativa = componentes['total'].rename('receita')
+    erro_padrao = np.sqrt(componentes['variancia']).rename('erro_padrao')
+    resultado = {
+        "Performance por Mês/Ano": estimativa,
+        "Erro Padrão": erro_padrao,
+        "Intervalo de Confiança": pd.DataFrame(
+            {
+                'inferior': estimativa - z * erro_padrao,
+                'superior': estimativa + z * erro_padrao,
+            }
+        ),
+        "Tamanho da Amostra": linhas_lidas,
+    }
+    if erro_alvo is not None:
+        atinge = z * erro_padrao <= erro_alvo * estimativa.abs()
+        resultado["Atinge Erro Alvo"] = atinge
+        if not atinge.all():
+            logger.warning(
+                "Meses acima do erro alvo: " f"{list(atinge.index[~atinge])}"
+            )
+    return resultado
+
+
+def _leitor_de_linhas(df_transacoes: pd.DataFrame) -> LeitorDeUnidades:
+    def ler(posicoes: np.ndarray) -> Tuple[pd.DataFrame, int]:
+        parte = df_transacoes.iloc[posicoes].assign(unidade=posicoes)
+        return _preparar_receita(parte), len(posicoes)
+
+    return ler
+
+
+def _leitor_de_blocos(
+    arquivo: io.BufferedReader,
+    cabecalho: bytes,
+    inicio_dados: int,
+    tamanho_arquivo: int,
+    tamanho_bloco: int,
+) -> LeitorDeUnidades:
+    """Lê blocos de bytes do CSV; cada linha pertence ao bloco onde começa"""
+
+    def ler(blocos: np.ndarray) -> Tuple[pd.DataFrame, int]:
+        pedacos, unidades = [], []
+        for bloco in np.sort(blocos):
+            inicio = inicio_dados + int(bloco) * tamanho_bloco
+            fim = min(inicio + tamanho_bloco, tamanho_arquivo)
+            # descarta o restante da linha iniciada no bloco anterior
+            arquivo.seek(inicio - 1)
+            arquivo.readline()
+            dados = arquivo.read(max(0, fim - arquivo.tell()))
+            if dados and not dados.endswith(b'\n'):
+                dados += arquivo.readline()
+                if not dados.endswith(b'\n'):
+                    dados += b'\n'
+            pedacos.append(dados)
+            unidades.append(np.full(dados.count(b'\n'), bloco))
+
+        parte = pd.read_csv(
+            io.BytesIO(cabecalho + b''.join(pedacos)),
+            encoding='utf-8',
+            usecols=['data_hora', 'quantidade', 'valor_unitario'],
+            skip_blank_lines=False,
+        )
+        unidade = np.concatenate(unidades)
+        if len(parte) != len(unidade):
+            raise ValueError(
+                "CSV com quebras de linha dentro de campos não é suportado "
+                "no modo amostral"
+            )
+        parte['unidade'] = unidade
+        return _preparar_receita(parte), len(parte)
+
+    return ler
+
+
+def analisar_vendas(
+    df_transacoes: pd.DataFrame,
+    tamanho_amostra: Optional[int] = None,
+    erro_alvo: Optional[float] = None,
+    confianca: float = CONFIANCA_PADRAO,
+    semente: Optional[int] = None,
+    janela_mensal: int = JANELA_MENSAL_PADRAO,
+    janela_diaria: int = JANELA_DIARIA_PADRAO,
+) -> Dict[str, Any]:
+    """Realiza a análise de vendas e retorna dados agregados.
+
+    No modo exato o resultado também traz ``"Indicadores Mensais"`` e
+    ``"Indicadores Diários"``: séries incrementais com receita, média
+    móvel e variações sobre o período anterior e sobre o ano anterior.
+    A tabela é obtida com ``como_dataframe()`` e o estado avança com
+    ``atualizar_analise_vendas``.
+
+    Por padrão o cálculo é exato. Informando ``tamanho_amostra`` (linhas
+    sorteadas) e/ou ``erro_alvo`` (meia-largura relativa do intervalo,
+    ex.: ``0.05``), só as linhas sorteadas são convertidas e a receita
+    mensal é estimada com erro padrão e intervalo de confiança; veja
+    ``analisar_vendas_amostral``.
+    """
+    amostral = tamanho_amostra is not None or erro_alvo is not None
+    if amostral:
+        _validar_amostragem(tamanho_amostra, erro_alvo, confianca)
     if df_transacoes is None or df_transacoes.empty:
-        return {"Performance por Mês/Ano": pd.Series(dtype=float)}
+        if amostral:
+            return _resultado_amostral_vazio()
+        return _resultado_vazio(janela_mensal, janela_diaria)
 
     try:
-        df = df_transacoes.copy()
-        df['data_hora'] = pd.to_datetime(
-            df['data_hora'], format='%Y-%m-%d %H:%M:%S', errors='coerce'
-        )
-        df = df.dropna(subset=['data_hora'])
-        if df.empty:
-            return {"Performance por Mês/Ano": pd.Series(dtype=float)}
+        if amostral:
+            z = NormalDist().inv_cdf((1 + confianca) / 2)
+            componentes, linhas_lidas = _sortear_unidades(
+                len(df_transacoes),
+                _leitor_de_linhas(df_transacoes),
+                (
+                    TAMANHO_AMOSTRA_PADRAO
+                    if tamanho_amostra is None
+                    else tamanho_amostra
+                ),
+                erro_alvo,
+                z,
+                np.random.default_rng(semente),
+            )
+            return _estimar_receita_mensal(
+                componentes, linhas_lidas, z, erro_alvo
+            )
 
-        df.loc[:, 'receita'] = pd.to_numeric(
-            df.get('quantidade', 0), errors='coerce'
-        ) * pd.to_numeric(df.get('valor_unitario', 0), errors='coerce')
-        df = df.dropna(subset=['receita'])
+        df = _preparar_receita(df_transacoes)
         if df.empty:
-            return {"Performance por Mês/Ano": pd.Series(dtype=float)}
+            return _resultado_vazio(janela_mensal, janela_diaria)
 
-        df.loc[:, 'mes_ano'] = df['data_hora'].dt.to_period('M').astype(str)
-        vendas_por_mes = df.groupby('mes_ano')['receita'].sum().sort_index()
+        vendas_por_mes = _receita_por_periodo(df, 'M')
+        vendas_por_dia = _receita_por_periodo(df, 'D')
 
-        return {"Performance por Mês/Ano": vendas_por_mes}
+        return {
+            "Performance por Mês/Ano": vendas_por_mes,
+            "Indicadores Mensais": SerieTemporalIncremental.de_series(
+                vendas_por_mes, 'M', janela_mensal
+            ),
+            "Indicadores Diários": SerieTemporalIncremental.de_series(
+                vendas_por_dia, 'D', janela_diaria
+            ),
+        }
     except Exception as e:
         logger.error(f"Erro na análise de vendas: {e}")
-        return {"Performance por Mês/Ano": pd.Series(dtype=float)}
+        if amostral:
+            return _resultado_amostral_vazio()
+        return _resultado_vazio(janela_mensal, janela_diaria)
+
+
+def atualizar_analise_vendas(
+    resultado: Dict[str, Any], df_novas_transacoes: pd.DataFrame
+) -> None:
+    """Incorpora novas transações a um resultado de ``analisar_vendas``.
+
+    O ``resultado`` é atualizado no lugar: só as novas linhas são
+    agregadas e cada dia/mês novo avança os indicadores incrementais sem
+    reprocessar o histórico. Se alguma transação for anterior ao último
+    dia/mês registrado, levanta ``ValueError`` sem alterar nada; nesse
+    caso é preciso chamar ``analisar_vendas`` de novo.
+    """
+    df = _preparar_receita(df_novas_transacoes)
+    if df.empty:
+        return
+
+    serie_mensal = resultado["Indicadores Mensais"]
+    serie_diaria = resultado["Indicadores Diários"]
+    novas_por_mes = _receita_por_periodo(df, 'M')
+    novas_por_dia = _receita_por_periodo(df, 'D')
+    # valida os dois níveis antes de alterar qualquer um deles
+    serie_mensal.verificar_periodo(novas_por_mes.index[0])
+    serie_diaria.verificar_periodo(novas_por_dia.index[0])
+
+    vendas_por_mes = resultado["Performance por Mês/Ano"]
+    for mes, valor in novas_por_mes.items():
+        serie_mensal.adicionar(mes, valor)
+        if len(vendas_por_mes) and vendas_por_mes.index[-1] == mes:
+            vendas_por_mes.iat[-1] += valor
+        else:
+            vendas_por_mes.loc[mes] = valor
+    for dia, valor in novas_por_dia.items():
+        serie_diaria.adicionar(dia, valor)
+
+
+def analisar_vendas_amostral(
+    caminho_arquivo: str,
+    tamanho_amostra: Optional[int] = None,
+    erro_alvo: Optional[float] = None,
+    confianca: float = CONFIANCA_PADRAO,
+    semente: Optional[int] = None,
+    tamanho_bloco: int = TAMANHO_BLOCO_PADRAO,
+) -> Dict[str, Any]:
+    """Prévia rápida da receita mensal amostrando durante a leitura do CSV.
+
+    O arquivo é dividido em K blocos de ``tamanho_bloco`` bytes e só os
+    blocos sorteados são lidos e convertidos; o restante nunca é
+    parseado. Toda linha tem a mesma probabilidade de inclusão, então os
+    totais (e o número de transações) são estimados, não contados.
+    ``tamanho_amostra`` é o número aproximado de linhas lidas; com
+    ``erro_alvo`` essa leitura é o piloto, ampliada até atingir o alvo,
+    e ``"Atinge Erro Alvo"`` marca os meses que ficaram acima dele.
+    Supõe um CSV sem quebras de linha dentro de campos.
+    """
+    _validar_amostragem(tamanho_amostra, erro_alvo, confianca)
+    if tamanho_bloco < 1:
+        raise ValueError("tamanho_bloco deve ser maior ou igual a 1")
+    linhas = (
+        TAMANHO_AMOSTRA_PADRAO if tamanho_amostra is None else tamanho_amostra
+    )
+    z = NormalDist().inv_cdf((1 + confianca) / 2)
+    try:
+        tamanho_arquivo = os.path.getsize(caminho_arquivo)
+        with open(caminho_arquivo, 'rb') as arquivo:
+            cabecalho = arquivo.readline()
+            inicio_dados = arquivo.tell()
+            total_blocos = math.ceil(
+                (tamanho_arquivo - inicio_dados) / tamanho_bloco
+            )
+            if total_blocos == 0:
+                return _resultado_amostral_vazio()
+
+            # estima bytes por linha no início dos dados
+            amostra_inicial = arquivo.read(tamanho_bloco)
+            bytes_por_linha = len(amostra_inicial) / max(
+                1, amostra_inicial.count(b'\n')
+            )
+            componentes, linhas_lidas = _sortear_unidades(
+                total_blocos,
+                _leitor_de_blocos(
+                    arquivo,
+                    cabecalho,
+                    inicio_dados,
+                    tamanho_arquivo,
+                    tamanho_bloco,
+                ),
+                math.ceil(linhas * bytes_por_linha / tamanho_bloco),
+                erro_alvo,
+                z,
+                np.random.default_rng(semente),
+            )
+        return _estimar_receita_mensal(componentes, linhas_lidas, z, erro_alvo)
+    except (FileNotFoundError, UnicodeDecodeError) as e:
+        logger.error(f"Erro ao abrir arquivo: {str(e)}")
+        return _resultado_amostral_vazio()
+    except Exception as e:
+        logger.error(f"Erro na análise amostral de vendas: {e}")
+        return _resultado_amostral_vazio()
 
 
 def gerar_grafico_performance_mensal(
@@ -96,6 +598,47 @@ def gerar_grafico_performance_mensal(
         raise Exception(f"Erro ao gerar gráfico: {e}")
 
 
+def gerar_grafico_indicadores(
+    indicadores: pd.DataFrame,
+    pasta_saida: str,
+    nome_arquivo: str,
+    titulo: str = 'Indicadores de Vendas',
+) -> None:
+    """Gera gráfico de receita com média móvel e variações percentuais"""
+    try:
+        if not isinstance(indicadores, pd.DataFrame) or indicadores.empty:
+            raise ValueError("indicadores deve ser um DataFrame não vazio")
+
+        os.makedirs(pasta_saida, exist_ok=True)
+
+        fig, (ax_receita, ax_variacao) = plt.subplots(
+            2, 1, figsize=(10, 8), sharex=True
+        )
+        indicadores['receita'].plot(ax=ax_receita, label='Receita')
+        indicadores['media_movel'].plot(
+            ax=ax_receita, linestyle='--', label='Média móvel'
+        )
+        ax_receita.set_title(titulo)
+        ax_receita.set_ylabel('Receita')
+        ax_receita.legend()
+
+        (indicadores[['variacao_periodo', 'variacao_anual']] * 100).plot(
+            ax=ax_variacao
+        )
+        ax_variacao.axhline(0, color='gray', linewidth=0.8)
+        ax_variacao.set_ylabel('Variação (%)')
+        ax_variacao.legend(['Período anterior', 'Ano anterior'])
+        plt.tight_layout()
+
+        caminho = os.path.join(pasta_saida, nome_arquivo)
+        plt.savefig(caminho)
+        plt.close(fig)
+        logger.info(f"Gráfico salvo em: {caminho}")
+    except Exception as e:
+        logger.error(f"Falha ao salvar o gráfico de indicadores: {e}")
+        raise Exception(f"Erro ao gerar gráfico: {e}")
+
+
 # --- Exemplo de Uso (Fluxo de Desenvolvimento) ---
 if __name__ == "__main__":
     # Simulação de Carregamento
@@ -110,6 +653,18 @@ if __name__ == "__main__":
         gerar_grafico_performance_mensal(
             vendas_mensais, PASTA_IMAGEM, "vendas_mensais.png"
         )
+        gerar_grafico_indicadores(
+            relatorio_vendas["Indicadores Mensais"].como_dataframe(),
+            PASTA_IMAGEM,
+            "indicadores_mensais.png",
+            'Indicadores Mensais de Vendas',
+        )
+        gerar_grafico_indicadores(
+            relatorio_vendas["Indicadores Diários"].como_dataframe(),
+            PASTA_IMAGEM,
+            "indicadores_diarios.png",
+            'Indicadores Diários de Vendas',
+        )
 
     # Executar verificação de estoque e alertas (opcional)
     try:
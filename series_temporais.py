@@ -0,0 +1,189 @@
+from datetime import date, timedelta
+from typing import Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+JANELA_MENSAL_PADRAO = 3
+JANELA_DIARIA_PADRAO = 7
+FREQUENCIAS_SUPORTADAS = ('M', 'D')
+_EPOCA = date(1970, 1, 1)  # ordinal 0 dos períodos diários do pandas
+
+
+def _ordinal_ano_anterior(ordinal: int, freq: str) -> int:
+    """Ordinal do mesmo período no ano anterior (29/02 vira 28/02)"""
+    if freq == 'M':
+        return ordinal - 12
+    dia = _EPOCA + timedelta(days=ordinal)
+    try:
+        anterior = dia.replace(year=dia.year - 1)
+    except ValueError:
+        anterior = dia.replace(year=dia.year - 1, day=28)
+    return (anterior - _EPOCA).days
+
+
+class SerieTemporalIncremental:
+    """Série por período com média móvel e variações mantidas como estado.
+
+    O estado inicial é calculado de forma vetorizada em ``de_series``.
+    Depois disso a soma da janela é atualizada por diferença, então
+    acrescentar o período seguinte custa O(1); uma lacuna de k períodos
+    sem vendas é preenchida com zeros em O(k). Reenviar o último período
+    soma ao seu valor, o que permite acumular transações do dia/mês
+    corrente. A tabela completa só é montada sob demanda, em
+    ``como_dataframe``.
+    """
+
+    def __init__(self, freq: str, janela: int) -> None:
+        if freq not in FREQUENCIAS_SUPORTADAS:
+            raise ValueError(
+                f"freq deve ser uma de {FREQUENCIAS_SUPORTADAS}: {freq!r}"
+            )
+        if janela < 1:
+            raise ValueError("janela deve ser maior ou igual a 1")
+        self.freq = freq
+        self.janela = janela
+        self._inicio: Optional[pd.Period] = None
+        self._valores: List[float] = []
+        self._medias: List[float] = []
+        self._variacoes: List[float] = []
+        self._variacoes_anuais: List[float] = []
+        self._soma_janela = 0.0
+
+    def __len__(self) -> int:
+        return len(self._valores)
+
+    @property
+    def ultimo_periodo(self) -> Optional[pd.Period]:
+        if self._inicio is None:
+            return None
+        return self._inicio + (len(self._valores) - 1)
+
+    def verificar_periodo(self, periodo: Any) -> pd.Period:
+        """Valida que ``periodo`` pode ser acrescentado sem alterar o estado"""
+        p = pd.Period(periodo, freq=self.freq)
+        ultimo = self.ultimo_periodo
+        if ultimo is not None and p < ultimo:
+            raise ValueError(
+                f"Período {p} anterior ao último registrado ({ultimo}); "
+                "recalcule a série completa"
+            )
+        return p
+
+    def adicionar(self, periodo: Any, valor: float) -> None:
+        """Acrescenta ``valor`` ao período informado (ex.: '2025-01')"""
+        p = self.verificar_periodo(periodo)
+        if self._inicio is None:
+            self._inicio = p
+            self._acrescentar(float(valor))
+            return
+
+        ultimo = self.ultimo_periodo
+        if p == ultimo:
+            self._somar_ao_ultimo(float(valor))
+            return
+        for _ in range((p - ultimo).n - 1):
+            self._acrescentar(0.0)
+        self._acrescentar(float(valor))
+
+    def _acrescentar(self, valor: float) -> None:
+        self._valores.append(valor)
+        self._soma_janela += valor
+        if len(self._valores) > self.janela:
+            self._soma_janela -= self._valores[-self.janela - 1]
+        self._medias.append(np.nan)
+        self._variacoes.append(np.nan)
+        self._variacoes_anuais.append(np.nan)
+        self._recalcular_ultimo()
+
+    def _somar_ao_ultimo(self, delta: float) -> None:
+        self._valores[-1] += delta
+        self._soma_janela += delta
+        self._recalcular_ultimo()
+
+    def _recalcular_ultimo(self) -> None:
+        i = len(self._valores) - 1
+        if i + 1 >= self.janela:
+            self._medias[i] = self._soma_janela / self.janela
+        if i >= 1:
+            self._variacoes[i] = self._variacao(i, i - 1)
+        inicio = self._inicio.ordinal
+        j = _ordinal_ano_anterior(inicio + i, self.freq) - inicio
+        if j >= 0:
+            self._variacoes_anuais[i] = self._variacao(i, j)
+
+    def _variacao(self, i: int, j: int) -> float:
+        anterior = self._valores[j]
+        if anterior == 0:
+            return np.nan
+        return (self._valores[i] - anterior) / anterior
+
+    def como_dataframe(self) -> pd.DataFrame:
+        """Materializa o estado atual em um DataFrame indexado por período"""
+        if self._inicio is None:
+            indice = pd.Index([], dtype=object)
+        else:
+            indice = pd.period_range(
+                self._inicio, periods=len(self._valores), freq=self.freq
+            ).astype(str)
+        return pd.DataFrame(
+            {
+                'receita': self._valores,
+                'media_movel': self._medias,
+                'variacao_periodo': self._variacoes,
+                'variacao_anual': self._variacoes_anuais,
+            },
+            index=indice,
+            dtype=float,
+        )
+
+    @classmethod
+    def de_series(
+        cls, serie: pd.Series, freq: str, janela: int
+    ) -> "SerieTemporalIncremental":
+        """Constrói o estado a partir de uma Series indexada por período.
+
+        Vetorizado: a série é reindexada no intervalo completo de
+        períodos (lacunas com zero) e os indicadores vêm de ``rolling`` e
+        de deslocamentos por posição, sem laço por período.
+        """
+        estado = cls(freq, janela)
+        if serie.empty:
+            return estado
+
+        periodos = pd.PeriodIndex(serie.index, freq=freq)
+        valores = (
+            pd.Series(serie.to_numpy(dtype=float), index=periodos)
+            .groupby(level=0)
+            .sum()
+        )
+        completo = pd.period_range(
+            valores.index.min(), valores.index.max(), freq=freq
+        )
+        valores = valores.reindex(completo, fill_value=0.0)
+        v = valores.to_numpy()
+
+        posicoes = np.arange(len(v))
+        if freq == 'M':
+            ano_anterior = posicoes - 12
+        else:
+            datas = completo.to_timestamp() - pd.DateOffset(years=1)
+            ano_anterior = datas.to_period(freq).asi8 - completo[0].ordinal
+
+        estado._inicio = completo[0]
+        estado._valores = v.tolist()
+        estado._medias = valores.rolling(janela).mean().tolist()
+        estado._variacoes = _variacoes(v, posicoes - 1).tolist()
+        estado._variacoes_anuais = _variacoes(v, ano_anterior).tolist()
+        estado._soma_janela = float(v[-janela:].sum())
+        return estado
+
+
+def _variacoes(valores: np.ndarray, anteriores: np.ndarray) -> np.ndarray:
+    """Variação de cada posição sobre ``valores[anteriores]`` (NaN se o
+    anterior não existe ou é zero)"""
+    validos = anteriores >= 0
+    base = np.full(len(valores), np.nan)
+    base[validos] = valores[anteriores[validos]]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(base != 0, (valores - base) / base, np.nan)
@@ -1,11 +1,18 @@
 import pytest
+import numpy as np
 import pandas as pd
 import os
+import tracemalloc
 from datetime import datetime
 import matplotlib.pyplot as plt
+
+import analise_varejo
 from analise_varejo import (
     _carregar_dados_com_seguranca,
     analisar_vendas,
+    analisar_vendas_amostral,
+    atualizar_analise_vendas,
+    gerar_grafico_indicadores,
     gerar_grafico_performance_mensal,
 )
 
@@ -281,3 +288,317 @@ def test_gerar_grafico_performance_mensal_save_error(monkeypatch):
         )
 
     assert "Erro ao gerar gráfico" in str(exc_info.value)
+
+
+@pytest.fixture
+def df_transacoes_volume():
+    """Três meses com 4000 transações cada, em ordem cronológica"""
+    rng = np.random.default_rng(42)
+    n = 12000
+    segundos = np.sort(rng.integers(0, 90 * 86400, size=n))
+    datas = pd.Timestamp('2025-01-01') + pd.to_timedelta(segundos, unit='s')
+    return pd.DataFrame(
+        {
+            'id_transacao': [f'T{i:05d}' for i in range(n)],
+            'data_hora': datas.strftime('%Y-%m-%d %H:%M:%S'),
+            'produto': ['Produto'] * n,
+            'quantidade': rng.integers(1, 10, size=n),
+            'valor_unitario': rng.uniform(1.0, 50.0, size=n).round(2),
+        }
+    )
+
+
+@pytest.fixture
+def csv_transacoes_volume(tmp_path, df_transacoes_volume):
+    caminho = tmp_path / 'transacoes.csv'
+    df_transacoes_volume.to_csv(caminho, index=False)
+    return str(caminho)
+
+
+@pytest.fixture
+def linhas_preparadas(monkeypatch):
+    """Conta as linhas convertidas (datas e receita) pela análise"""
+    contagem = []
+    preparar = analise_varejo._preparar_receita
+
+    def contar(df):
+        contagem.append(len(df))
+        return preparar(df)
+
+    monkeypatch.setattr(analise_varejo, '_preparar_receita', contar)
+    return contagem
+
+
+def _cobertura(resultado, exato):
+    """Meses cujo intervalo contém o total exato (mês ausente conta como
+    falha)"""
+    intervalo = resultado['Intervalo de Confiança'].reindex(exato.index)
+    return (intervalo['inferior'] <= exato) & (exato <= intervalo['superior'])
+
+
+def test_analisar_vendas_amostral_cobertura(df_transacoes_volume):
+    """Intervalos de 95% cobrem o total exato na grande maioria dos sorteios"""
+    exato = analisar_vendas(df_transacoes_volume)['Performance por Mês/Ano']
+
+    coberturas = [
+        _cobertura(
+            analisar_vendas(
+                df_transacoes_volume, tamanho_amostra=600, semente=semente
+            ),
+            exato,
+        )
+        for semente in range(100)
+    ]
+
+    assert pd.concat(coberturas).mean() >= 0.9
+
+
+def test_analisar_vendas_amostral_le_menos_linhas(
+    df_transacoes_volume, linhas_preparadas
+):
+    """O modo amostral só converte as linhas sorteadas"""
+    resultado = analisar_vendas(
+        df_transacoes_volume, tamanho_amostra=600, semente=1
+    )
+
+    assert sum(linhas_preparadas) == 600
+    assert resultado['Tamanho da Amostra'] == 600
+    assert list(resultado['Performance por Mês/Ano'].index) == [
+        '2025-01',
+        '2025-02',
+        '2025-03',
+    ]
+
+
+def test_analisar_vendas_amostral_sem_amostragem_efetiva(
+    df_transacoes_teste,
+):
+    """Com amostra maior que a população o resultado é exato"""
+    resultado = analisar_vendas(df_transacoes_teste, tamanho_amostra=100)
+    assert resultado['Performance por Mês/Ano'].sum() == pytest.approx(18.0)
+    assert (resultado['Erro Padrão'] == 0).all()
+
+
+def test_analisar_vendas_amostral_erro_alvo(df_transacoes_volume):
+    """Erro alvo amplia o piloto até a meia-largura ficar abaixo do alvo"""
+    resultado = analisar_vendas(
+        df_transacoes_volume, tamanho_amostra=100, erro_alvo=0.05, semente=7
+    )
+    estimativa = resultado['Performance por Mês/Ano']
+    intervalo = resultado['Intervalo de Confiança']
+    meia_largura = (intervalo['superior'] - intervalo['inferior']) / 2
+
+    assert 100 < resultado['Tamanho da Amostra'] < len(df_transacoes_volume)
+    assert resultado['Atinge Erro Alvo'].all()
+    assert (meia_largura / estimativa <= 0.05).all()
+
+
+def test_analisar_vendas_amostral_erro_alvo_nao_atingido(
+    monkeypatch, df_transacoes_volume
+):
+    """Meses fora do alvo são sinalizados quando a amostra não é ampliada"""
+    monkeypatch.setattr(analise_varejo, 'MAX_RODADAS_AMOSTRAGEM', 0)
+    resultado = analisar_vendas(
+        df_transacoes_volume, tamanho_amostra=100, erro_alvo=0.01, semente=7
+    )
+
+    assert resultado['Tamanho da Amostra'] == 100
+    assert not resultado['Atinge Erro Alvo'].any()
+
+
+def test_analisar_vendas_amostral_arquivo(
+    csv_transacoes_volume, df_transacoes_volume, linhas_preparadas
+):
+    """Só os blocos sorteados do CSV são lidos e convertidos"""
+    exato = analisar_vendas(df_transacoes_volume)['Performance por Mês/Ano']
+    linhas_preparadas.clear()
+
+    coberturas = []
+    for semente in range(100):
+        resultado = analisar_vendas_amostral(
+            csv_transacoes_volume, tamanho_amostra=600, semente=semente
+        )
+        linhas_lidas = resultado['Tamanho da Amostra']
+        assert linhas_lidas < 0.1 * len(df_transacoes_volume)
+        coberturas.append(_cobertura(resultado, exato))
+
+    assert sum(linhas_preparadas) < 0.1 * 100 * len(df_transacoes_volume)
+    assert pd.concat(coberturas).mean() >= 0.9
+
+
+def test_analisar_vendas_amostral_arquivo_completo(
+    csv_transacoes_volume, df_transacoes_volume
+):
+    """Sorteando todos os blocos o resultado coincide com o exato"""
+    exato = analisar_vendas(df_transacoes_volume)['Performance por Mês/Ano']
+    resultado = analisar_vendas_amostral(
+        csv_transacoes_volume, tamanho_amostra=len(df_transacoes_volume) * 2
+    )
+
+    assert resultado['Tamanho da Amostra'] == len(df_transacoes_volume)
+    pd.testing.assert_series_equal(
+        resultado['Performance por Mês/Ano'], exato, check_names=False
+    )
+    assert (resultado['Erro Padrão'] == 0).all()
+
+
+def test_sortear_unidades_proporcional_a_amostra():
+    """O sorteio não materializa as unidades da população inteira"""
+
+    def ler(unidades):
+        lidas.append(unidades)
+        return pd.DataFrame(), len(unidades)
+
+    lidas = []
+    tracemalloc.start()
+    _, linhas_lidas = analise_varejo._sortear_unidades(
+        10**9, ler, 4000, None, 1.96, np.random.default_rng(0)
+    )
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    unidades = np.concatenate(lidas)
+    assert linhas_lidas == 4000
+    assert len(np.unique(unidades)) == 4000
+    assert pico < 5 * 1024**2
+
+
+def test_sortear_novas_uniforme():
+    """Cada unidade tem a mesma chance dentro do estrato, inclusive ao
+    ampliar a amostra e quando quase todo o estrato é lido"""
+    limites = np.array([0, 10, 20])
+    rng = np.random.default_rng(3)
+    contagem = np.zeros(20)
+    for _ in range(5000):
+        piloto = analise_varejo._sortear_novas(
+            limites, np.empty(0, dtype=int), np.array([2, 2]), rng
+        )
+        ampliacao = analise_varejo._sortear_novas(
+            limites, np.sort(piloto), np.array([2, 7]), rng
+        )
+        unidades = np.concatenate([piloto, ampliacao])
+        assert len(np.unique(unidades)) == 13
+        contagem[unidades] += 1
+
+    frequencias = contagem / 5000
+    assert frequencias[:10] == pytest.approx(np.full(10, 0.4), abs=0.03)
+    assert frequencias[10:] == pytest.approx(np.full(10, 0.9), abs=0.03)
+
+
+@pytest.mark.parametrize(
+    "parametros",
+    [
+        {'tamanho_amostra': 0},
+        {'erro_alvo': 0},
+        {'erro_alvo': -0.1},
+        {'tamanho_amostra': 100, 'confianca': 1.5},
+        {'tamanho_amostra': 100, 'confianca': 0},
+    ],
+)
+def test_analisar_vendas_amostral_parametros_invalidos(
+    parametros, df_transacoes_teste, csv_transacoes_volume
+):
+    with pytest.raises(ValueError):
+        analisar_vendas(df_transacoes_teste, **parametros)
+    with pytest.raises(ValueError):
+        analisar_vendas_amostral(csv_transacoes_volume, **parametros)
+
+
+def test_analisar_vendas_amostral_arquivo_inexistente():
+    resultado = analisar_vendas_amostral('arquivo_inexistente.csv')
+    assert resultado['Performance por Mês/Ano'].empty
+    assert resultado['Intervalo de Confiança'].empty
+
+
+def test_analisar_vendas_indicadores(df_transacoes_teste):
+    """Resultado exato inclui indicadores temporais mensais e diários"""
+    resultado = analisar_vendas(df_transacoes_teste, janela_diaria=2)
+
+    indicadores = resultado['Indicadores Diários'].como_dataframe()
+    assert len(indicadores) == 6  # dias sem venda preenchidos com zero
+    assert indicadores.loc['2025-01-10', 'receita'] == 10.0
+    assert indicadores.loc['2025-01-15', 'media_movel'] == 4.0
+    mensais = resultado['Indicadores Mensais'].como_dataframe()
+    assert mensais.loc['2025-01', 'receita'] == 18.0
+
+
+def test_atualizar_analise_vendas(df_transacoes_teste):
+    """Atualização incremental equivale a reanalisar o histórico completo"""
+    novas = pd.DataFrame(
+        {
+            'id_transacao': ['T0003', 'T0004', 'T0005'],
+            'data_hora': [
+                '2025-01-15 18:00:00',
+                '2025-02-03 10:00:00',
+                '2025-03-20 11:00:00',
+            ],
+            'produto': ['Pão de Forma', 'Leite Integral 1L', 'Café'],
+            'quantidade': [1, 4, 2],
+            'valor_unitario': [8.00, 5.00, 12.00],
+        }
+    )
+    resultado = analisar_vendas(df_transacoes_teste, janela_mensal=2)
+    atualizar_analise_vendas(resultado, novas)
+    completo = analisar_vendas(
+        pd.concat([df_transacoes_teste, novas]), janela_mensal=2
+    )
+
+    pd.testing.assert_series_equal(
+        resultado['Performance por Mês/Ano'],
+        completo['Performance por Mês/Ano'],
+        check_names=False,
+    )
+    for chave in ['Indicadores Mensais', 'Indicadores Diários']:
+        pd.testing.assert_frame_equal(
+            resultado[chave].como_dataframe(),
+            completo[chave].como_dataframe(),
+        )
+
+
+def test_atualizar_analise_vendas_periodo_anterior():
+    """Dia retroativo no mês corrente é rejeitado sem alterar o estado"""
+    resultado = analisar_vendas(
+        pd.DataFrame(
+            {
+                'id_transacao': ['T001', 'T002'],
+                'data_hora': ['2025-03-10 10:00:00', '2025-03-15 10:00:00'],
+                'produto': ['Produto', 'Produto'],
+                'quantidade': [1, 2],
+                'valor_unitario': [10.0, 10.0],
+            }
+        )
+    )
+    retroativa = pd.DataFrame(
+        {
+            'id_transacao': ['T003'],
+            'data_hora': ['2025-03-12 10:00:00'],
+            'produto': ['Produto'],
+            'quantidade': [1],
+            'valor_unitario': [100.0],
+        }
+    )
+
+    with pytest.raises(ValueError):
+        atualizar_analise_vendas(resultado, retroativa)
+
+    assert resultado['Performance por Mês/Ano'].sum() == 30.0
+    mensais = resultado['Indicadores Mensais'].como_dataframe()
+    assert mensais['receita'].sum() == 30.0
+    diarios = resultado['Indicadores Diários'].como_dataframe()
+    assert diarios['receita'].sum() == 30.0
+
+
+def test_gerar_grafico_indicadores(tmp_path, df_transacoes_teste):
+    resultado = analisar_vendas(df_transacoes_teste)
+    indicadores = resultado['Indicadores Diários'].como_dataframe()
+    gerar_grafico_indicadores(indicadores, str(tmp_path), 'indicadores.png')
+    assert (tmp_path / 'indicadores.png').exists()
+
+
+def test_gerar_grafico_indicadores_vazio(tmp_path):
+    with pytest.raises(Exception) as exc_info:
+        gerar_grafico_indicadores(
+            pd.DataFrame(), str(tmp_path), 'indicadores.png'
+        )
+
+    assert "Erro ao gerar gráfico" in str(exc_info.value)
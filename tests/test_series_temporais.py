@@ -0,0 +1,139 @@
+import pytest
+import numpy as np
+import pandas as pd
+import time
+
+from series_temporais import SerieTemporalIncremental
+
+
+@pytest.fixture
+def serie_mensal():
+    indice = pd.period_range('2023-01', periods=30, freq='M').astype(str)
+    valores = np.random.default_rng(0).uniform(100.0, 500.0, size=30)
+    return pd.Series(valores, index=indice)
+
+
+def test_serie_incremental_equivale_ao_recalculo(serie_mensal):
+    """Estado incremental deve coincidir com rolling/pct_change do pandas"""
+    estado = SerieTemporalIncremental.de_series(serie_mensal, 'M', 3)
+    resultado = estado.como_dataframe()
+
+    pd.testing.assert_series_equal(
+        resultado['media_movel'],
+        serie_mensal.rolling(3).mean(),
+        check_names=False,
+    )
+    pd.testing.assert_series_equal(
+        resultado['variacao_periodo'],
+        serie_mensal.pct_change(),
+        check_names=False,
+    )
+    pd.testing.assert_series_equal(
+        resultado['variacao_anual'],
+        serie_mensal.pct_change(12),
+        check_names=False,
+    )
+
+
+def test_serie_incremental_preenche_periodos_ausentes():
+    estado = SerieTemporalIncremental('D', 2)
+    estado.adicionar('2025-01-01', 10.0)
+    estado.adicionar('2025-01-04', 20.0)
+
+    resultado = estado.como_dataframe()
+    assert list(resultado.index) == [
+        '2025-01-01',
+        '2025-01-02',
+        '2025-01-03',
+        '2025-01-04',
+    ]
+    assert list(resultado['receita']) == [10.0, 0.0, 0.0, 20.0]
+    assert resultado['media_movel'].iloc[-1] == 10.0
+    assert np.isnan(resultado['variacao_periodo'].iloc[-1])
+
+
+def test_serie_incremental_acumula_ultimo_periodo():
+    estado = SerieTemporalIncremental('M', 2)
+    estado.adicionar('2025-01', 100.0)
+    estado.adicionar('2025-02', 50.0)
+    estado.adicionar('2025-02', 50.0)
+
+    resultado = estado.como_dataframe()
+    assert len(estado) == 2
+    assert resultado['receita'].iloc[-1] == 100.0
+    assert resultado['media_movel'].iloc[-1] == 100.0
+    assert resultado['variacao_periodo'].iloc[-1] == 0.0
+
+
+def test_serie_incremental_variacao_anual_diaria():
+    estado = SerieTemporalIncremental('D', 7)
+    estado.adicionar('2024-03-01', 100.0)
+    estado.adicionar('2025-03-01', 150.0)
+
+    resultado = estado.como_dataframe()
+    assert resultado.loc['2025-03-01', 'variacao_anual'] == 0.5
+
+
+def test_serie_incremental_rejeita_periodo_anterior():
+    estado = SerieTemporalIncremental('M', 3)
+    estado.adicionar('2025-02', 10.0)
+    with pytest.raises(ValueError):
+        estado.adicionar('2025-01', 10.0)
+
+
+def test_serie_incremental_janela_invalida():
+    with pytest.raises(ValueError):
+        SerieTemporalIncremental('M', 0)
+
+
+def test_serie_incremental_vetorizada_equivale_a_adicionar():
+    """de_series (vetorizado) e adicionar (por período) dão o mesmo estado,
+    inclusive com lacunas e 29/02"""
+    serie = pd.Series(
+        [10.0, 5.0, 7.0, 3.0, 4.0],
+        index=[
+            '2023-02-28',
+            '2023-03-01',
+            '2024-02-29',
+            '2024-03-01',
+            '2025-02-28',
+        ],
+    )
+    incremental = SerieTemporalIncremental('D', 7)
+    for periodo, valor in serie.items():
+        incremental.adicionar(periodo, valor)
+    vetorizado = SerieTemporalIncremental.de_series(serie, 'D', 7)
+
+    pd.testing.assert_frame_equal(
+        vetorizado.como_dataframe(), incremental.como_dataframe()
+    )
+    resultado = vetorizado.como_dataframe()
+    assert resultado.loc['2024-02-29', 'variacao_anual'] == -0.3
+    assert resultado.loc['2024-03-01', 'variacao_anual'] == pytest.approx(-0.4)
+
+    vetorizado.adicionar('2025-03-01', 6.0)
+    incremental.adicionar('2025-03-01', 6.0)
+    pd.testing.assert_frame_equal(
+        vetorizado.como_dataframe(), incremental.como_dataframe()
+    )
+
+
+def test_serie_incremental_historico_diario_longo():
+    """Uma data antiga isolada gera ~45 mil dias sem laço por período"""
+    serie = pd.Series(
+        [1.0, 2.0, 3.0], index=['1900-01-01', '2024-12-31', '2025-01-01']
+    )
+
+    inicio = time.perf_counter()
+    estado = SerieTemporalIncremental.de_series(serie, 'D', 7)
+    resultado = estado.como_dataframe()
+    duracao = time.perf_counter() - inicio
+
+    assert len(resultado) == 45657
+    assert resultado['receita'].sum() == 6.0
+    assert duracao < 0.5
+
+
+def test_serie_incremental_frequencia_invalida():
+    with pytest.raises(ValueError):
+        SerieTemporalIncremental('W', 3)